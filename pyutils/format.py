@@ -2,20 +2,37 @@
 # -*- coding: utf-8 -*-
 
 import csv
+import glob
+import importlib
 import logging
 import os
 import datetime
+import queue
+import re
+import shutil
 import sys
+import threading
+import time
+import traceback
 from io import StringIO
-from logging.handlers import RotatingFileHandler
-
-from IPython.core.display import HTML
-from IPython.display import display
+from logging.handlers import BaseRotatingHandler, RotatingFileHandler
 
 _log = logging.getLogger(__name__)
 __STDOUT_LOG_CHANNEL__ = None
 __FILE_LOG_CHANNEL__ = None
 
+LOG_COLUMNS = ['date', 'thread', 'process', 'level', 'file', 'line', 'function', 'msg', 'path']
+_LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+_LOG_RECORD_START = re.compile(rb'^"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{6})",')
+_LOG_SEGMENT_FORMAT = '%Y%m%d-%H%M%S-%f'
+_LOG_SEGMENT = re.compile(r'^\.(\d{8}-\d{6}-\d{6})(\.(gz|bz2|xz))?$')
+# compression modules are imported on first use, see _compressor
+_COMPRESSORS = {'gz': 'gzip', 'bz2': 'bz2', 'xz': 'lzma'}
+
+EASY_DATASET_URL = 'https://easy.dans.knaw.nl/ui/datasets/id/'
+DOI_URL = 'https://doi.org/'
+FEDORA_OBJECTS_URL = 'http://easy01.dans.knaw.nl:8080/fedora/objects/'
+
 
 def start_logging(level=logging.DEBUG):
     """
@@ -78,6 +95,33 @@ def info(func, *args, **kwargs):
     return ret_val
 
 
+def profile(func, *args, profile_sort='cumulative', profile_limit=30, profile_file=None, **kwargs):
+    """
+    Wrapper like `debug` that also runs the function under cProfile. After the function returns, the profile
+    statistics are printed to stdout, sorted by profile_sort.
+    :param func: the function to call
+    :param args: arguments for the function
+    :param profile_sort: sort key for the statistics, see pstats.Stats.sort_stats, default 'cumulative'
+    :param profile_limit: number of lines of statistics to print, default 30
+    :param profile_file: file to dump the raw statistics to, default None
+    :param kwargs: named arguments for the function
+    :return: the return value of the function
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    start_logging(logging.DEBUG)
+    try:
+        ret_val = profiler.runcall(func, *args, **kwargs)
+    finally:
+        end_logging()
+        if profile_file is not None:
+            profiler.dump_stats(profile_file)
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats(profile_sort).print_stats(profile_limit)
+    return ret_val
+
+
 class CsvFormatter(logging.Formatter):
 
     def __init__(self):
@@ -86,7 +130,7 @@ class CsvFormatter(logging.Formatter):
         self.writer = csv.writer(self.output, quoting=csv.QUOTE_ALL)
 
     def format(self, record):
-        time = datetime.datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S.%f')
+        time = datetime.datetime.fromtimestamp(record.created).strftime(_LOG_DATE_FORMAT)
         self.writer.writerow([time, record.threadName, record.process, record.levelname, record.filename,
                               record.lineno, record.funcName, record.msg, record.pathname])
         data = self.output.getvalue()
@@ -95,29 +139,147 @@ class CsvFormatter(logging.Formatter):
         return data.strip()
 
 
+class CompressingFileHandler(BaseRotatingHandler):
+    """
+    Handler for logging to a file that is rolled over on size and/or time. Rolled over segments are named
+    after the moment of roll over in UTC, i.e. `pyu.log.20190301-100000-000000.gz`, so they sort in
+    chronological order, also across a DST fall-back. They are compressed on a background thread, so the
+    logging thread never waits for compression. Compressed segments can be read with `read_log` or with
+    a plain `pd.read_csv`.
+    """
+
+    def __init__(self, filename, max_bytes=0, rotate_interval=None, backup_count=3, compression='gz',
+                 encoding=None):
+        """
+        :param filename: the path to the active log file
+        :param max_bytes: max bytes for roll over, 0 for no size based roll over
+        :param rotate_interval: seconds or datetime.timedelta between roll overs, None for no time based roll over.
+                Roll overs are aligned to multiples of the interval since the epoch.
+        :param backup_count: how many segments are kept, 0 to keep all segments
+        :param compression: one of 'gz', 'bz2', 'xz' or None for no compression
+        :param encoding: encoding of the file
+        """
+        if compression is not None and compression not in _COMPRESSORS:
+            raise ValueError('Unknown compression: {}. Expected one of {}'.format(compression, list(_COMPRESSORS)))
+        super().__init__(filename, 'a', encoding=encoding)
+        if isinstance(rotate_interval, datetime.timedelta):
+            rotate_interval = rotate_interval.total_seconds()
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.compression = compression
+        self.rollover_at = self._compute_rollover(time.time())
+        self._segments = queue.Queue()
+        self._worker = threading.Thread(target=self._compress_segments, name='CompressingFileHandler', daemon=True)
+        self._worker.start()
+
+    def _compute_rollover(self, now):
+        if not self.rotate_interval:
+            return None
+        return (now // self.rotate_interval + 1) * self.rotate_interval
+
+    def shouldRollover(self, record):
+        if self.rollover_at is not None and record.created >= self.rollover_at:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            msg = '%s\n' % self.format(record)
+            self.stream.seek(0, 2)
+            if self.stream.tell() + len(msg) >= self.max_bytes:
+                return True
+        return False
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        now = time.time()
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            segment = '{}.{}'.format(self.baseFilename, datetime.datetime.fromtimestamp(now, datetime.timezone.utc)
+                                     .strftime(_LOG_SEGMENT_FORMAT))
+            os.rename(self.baseFilename, segment)
+            self._segments.put(segment)
+        self.rollover_at = self._compute_rollover(now)
+        self.stream = self._open()
+
+    def _compress_segments(self):
+        while True:
+            segment = self._segments.get()
+            if segment is None:
+                break
+            try:
+                if self.compression is not None and os.path.exists(segment):
+                    self._compress(segment)
+                self._remove_old_segments()
+            except OSError:
+                if logging.raiseExceptions:
+                    traceback.print_exc(file=sys.stderr)
+
+    def _compress(self, segment):
+        target = '{}.{}'.format(segment, self.compression)
+        with open(segment, 'rb') as src, _compressor(self.compression).open(target + '.tmp', 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        stats = os.stat(segment)
+        os.utime(target + '.tmp', (stats.st_atime, stats.st_mtime))
+        os.replace(target + '.tmp', target)
+        os.remove(segment)
+
+    def _remove_old_segments(self):
+        if self.backup_count <= 0:
+            return
+        segments = {}
+        for path in glob.glob(glob.escape(self.baseFilename) + '.*'):
+            match = _LOG_SEGMENT.match(path[len(self.baseFilename):])
+            if match:
+                segments.setdefault(match.group(1), []).append(path)
+        for stamp in sorted(segments)[:-self.backup_count]:
+            for path in segments[stamp]:
+                os.remove(path)
+
+    def close(self):
+        """
+        Close the log file and wait for pending compressions to finish.
+        """
+        super().close()
+        if self._worker.is_alive():
+            self._segments.put(None)
+            self._worker.join()
+
+
 def start_file_logging(log_file='logs/pyu.log', level=logging.DEBUG, max_bytes=1000 * 1000 * 1024,
-                          backup_count=3, encoding='utf-8'):
+                          backup_count=3, encoding='utf-8', compression=None, rotate_interval=None):
     """
-    Initiate logging to a rotating file. If needed, the log file output can be picked up in a DataFrame:
+    Initiate logging to a rotating file. If needed, the log file output, including rotated backups,
+    can be picked up in a DataFrame with `read_log`:
     ```
-    names = ['date', 'thread', 'process', 'level', 'file', 'line', 'function', 'msg', 'path']
-    df = pd.read_csv('logs/pyu.log', header=None, quoting=1, converters={0: pd.to_datetime}, names=names)
+    df = read_log('logs/pyu.log', start='2019-03-01 10:00', end='2019-03-01 10:10', levels=['ERROR'])
     ```
+    If compression or rotate_interval is given, logging is done with a `CompressingFileHandler`, otherwise
+    with a `RotatingFileHandler`.
 
     :param log_file: the path or file to write to. Directories will be created.
     :param level: the log level. one of logging levels
                 logging.DEBUG (10), logging.INFO (20), logging.WARNING (30), logging.ERROR (40), logging.CRITICAL (50)
-    :param max_bytes: max bytes for roll over
-    :param backup_count: how many files are kept
+    :param max_bytes: max bytes for roll over, 0 for no size based roll over
+    :param backup_count: how many rolled over files are kept. With a `RotatingFileHandler` 0 means the file is
+                never rolled over; with a `CompressingFileHandler` 0 means all segments are kept
     :param encoding: encoding of the file
+    :param compression: compress rotated files with one of 'gz', 'bz2', 'xz', default None
+    :param rotate_interval: seconds or datetime.timedelta between roll overs, default None
     :return: None
     """
     global __FILE_LOG_CHANNEL__
     if __FILE_LOG_CHANNEL__ is None:
         path = os.path.dirname(log_file)
         os.makedirs(path, exist_ok=True)
-        __FILE_LOG_CHANNEL__ = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
-                                                   encoding=encoding)
+        if compression is None and rotate_interval is None:
+            __FILE_LOG_CHANNEL__ = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                       encoding=encoding)
+        else:
+            __FILE_LOG_CHANNEL__ = CompressingFileHandler(log_file, max_bytes=max_bytes,
+                                                          rotate_interval=rotate_interval, backup_count=backup_count,
+                                                          compression=compression, encoding=encoding)
         __FILE_LOG_CHANNEL__.setFormatter(CsvFormatter())
         __FILE_LOG_CHANNEL__.setLevel(level)
         root = logging.getLogger()
@@ -140,9 +302,213 @@ def end_file_logging():
         _log.info('End file logging to {}'.format(__FILE_LOG_CHANNEL__.baseFilename))
         root = logging.getLogger()
         root.removeHandler(__FILE_LOG_CHANNEL__)
+        __FILE_LOG_CHANNEL__.close()
         __FILE_LOG_CHANNEL__ = None
 
 
+def _first_record(f, offset):
+    """
+    Find the first log record that starts at or after the given byte offset.
+
+    :param f: log file opened in binary mode
+    :param offset: byte offset to start looking from
+    :return: tuple of (offset of the record, timestamp of the record as bytes); (None, None) if there is none
+    """
+    if offset > 0:
+        # skip the remainder of the line that contains offset - 1
+        f.seek(offset - 1)
+        f.readline()
+    else:
+        f.seek(0)
+    while True:
+        pos = f.tell()
+        line = f.readline()
+        if not line:
+            return None, None
+        match = _LOG_RECORD_START.match(line)
+        if match:
+            return pos, match.group(1)
+
+
+def _bisect_log(f, size, stamp, inclusive):
+    """
+    Binary search the byte offset of the first record with a timestamp after stamp.
+
+    :param f: log file opened in binary mode
+    :param size: size of the file in bytes
+    :param stamp: timestamp as bytes, formatted like the log records
+    :param inclusive: also stop at records with a timestamp equal to stamp
+    :return: offset of the first record past stamp, or size if there is none
+    """
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        pos, ts = _first_record(f, mid)
+        if pos is None or ts > stamp or (inclusive and ts == stamp):
+            hi = mid
+        else:
+            lo = mid + 1
+    pos, ts = _first_record(f, lo)
+    return size if pos is None else pos
+
+
+def _log_stamp(moment, shift=0):
+    """
+    Format a moment like the timestamps in the log records.
+
+    :param moment: datetime or string, or None
+    :param shift: seconds or datetime.timedelta to add to moment
+    :return: the timestamp as bytes, or None if moment is None
+    """
+    import pandas as pd
+
+    if moment is None:
+        return None
+    shift = pd.Timedelta(shift) if isinstance(shift, datetime.timedelta) else pd.Timedelta(seconds=shift)
+    return (pd.Timestamp(moment) + shift).strftime(_LOG_DATE_FORMAT).encode('ascii')
+
+
+def _compressor(compression):
+    return importlib.import_module(_COMPRESSORS[compression])
+
+
+def _open_log(path):
+    """
+    Open a log file in binary mode, decompressing it if its extension is one of the known compressions.
+    """
+    compression = os.path.splitext(path)[1][1:]
+    return _compressor(compression).open(path, 'rb') if compression in _COMPRESSORS else open(path, 'rb')
+
+
+def log_files(log_file='logs/pyu.log'):
+    """
+    List the log file and its rotated backups, compressed or not, in chronological order, oldest first.
+
+    :param log_file: the path to the active log file
+    :return: list of tuples of (path, timestamp of the first record as bytes)
+    """
+    paths = [path for path in glob.glob(glob.escape(log_file) + '.*') if not path.endswith('.tmp')]
+    # an uncompressed segment is skipped once its compressed copy is complete
+    paths = [path for path in paths if not any(path + '.' + ext in paths for ext in _COMPRESSORS)]
+    if os.path.exists(log_file):
+        paths.append(log_file)
+    files = []
+    for path in paths:
+        try:
+            with _open_log(path) as f:
+                pos, ts = _first_record(f, 0)
+        except FileNotFoundError:
+            # removed by roll over or compression after listing
+            continue
+        if pos is not None:
+            files.append((path, ts))
+    files.sort(key=lambda item: (item[1], item[0] == log_file))
+    return files
+
+
+def _read_log_window(path, start, end, encoding):
+    """
+    Read the text of the records in a log file that fall between start and end.
+    """
+    if os.path.splitext(path)[1][1:] in _COMPRESSORS:
+        return _read_compressed_log_window(path, start, end, encoding)
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        lo = 0 if start is None else _bisect_log(f, size, start, True)
+        hi = size if end is None else _bisect_log(f, size, end, False)
+        if hi <= lo:
+            return ''
+        f.seek(lo)
+        return f.read(hi - lo).decode(encoding)
+
+
+def _read_compressed_log_window(path, start, end, encoding):
+    """
+    Read the text of the records in a compressed log file that fall between start and end. Compressed
+    files cannot be searched by byte offset, so the lines are scanned until the first record after end.
+    Records that are out of order are kept or skipped on their own timestamp.
+    """
+    lines = []
+    keep = start is None
+    with _open_log(path) as f:
+        for line in f:
+            match = _LOG_RECORD_START.match(line)
+            if match:
+                if end is not None and match.group(1) > end:
+                    break
+                keep = start is None or match.group(1) >= start
+            if keep:
+                lines.append(line)
+    return b''.join(lines).decode(encoding)
+
+
+def read_log(log_file='logs/pyu.log', start=None, end=None, levels=None, functions=None, encoding='utf-8',
+             slack=5):
+    """
+    Read log records written by `start_file_logging` into a DataFrame. The active log file and all rotated
+    backups are read in chronological order. Only the part of each file between start and end is read;
+    the position of that part is found by binary search on the records. Compressed backups are scanned
+    instead, but only if their time range overlaps with start and end.
+
+    Records are not written in strict timestamp order: a record is stamped before the handler is locked, so
+    records of different threads can be swapped. The search therefore reads from start - slack to end + slack,
+    after which records are filtered on their timestamp exactly. Records that are further out of order than
+    slack can be missed near start and end. Timestamps are in local time, so around the repeated hour of
+    a DST fall-back a slack of an hour is needed.
+
+    :param log_file: the path to the active log file
+    :param start: only read records at or after this moment (datetime or string), default None
+    :param end: only read records at or before this moment (datetime or string), default None
+    :param levels: only keep records with these level names or numbers, default None
+    :param functions: only keep records logged from functions with these names, default None
+    :param encoding: encoding of the log files
+    :param slack: seconds or datetime.timedelta that records can be out of order, default 5
+    :return: DataFrame with columns LOG_COLUMNS
+    """
+    import pandas as pd
+
+    # search bounds, widened by slack, and the exact bounds as str, to compare with the parsed rows
+    search_start = _log_stamp(start, -slack)
+    search_end = _log_stamp(end, slack)
+    start = None if start is None else _log_stamp(start).decode('ascii')
+    end = None if end is None else _log_stamp(end).decode('ascii')
+    if levels is not None:
+        levels = [levels] if isinstance(levels, (str, int)) else levels
+        levels = {logging.getLevelName(level) if isinstance(level, int) else level.upper() for level in levels}
+    if functions is not None:
+        functions = {functions} if isinstance(functions, str) else set(functions)
+
+    files = log_files(log_file)
+    rows = []
+    for i, (path, first) in enumerate(files):
+        if search_end is not None and first > search_end:
+            break
+        if search_start is not None and i + 1 < len(files) and files[i + 1][1] < search_start:
+            continue
+        try:
+            text = _read_log_window(path, search_start, search_end, encoding)
+        except FileNotFoundError:
+            # renamed by roll over or removed after compression since listing
+            continue
+        for row in csv.reader(StringIO(text)):
+            if len(row) != len(LOG_COLUMNS):
+                continue
+            if (start is not None and row[0] < start) or (end is not None and row[0] > end):
+                continue
+            if levels is not None and row[3] not in levels:
+                continue
+            if functions is not None and row[6] not in functions:
+                continue
+            rows.append(row)
+
+    df = pd.DataFrame(rows, columns=LOG_COLUMNS)
+    df['date'] = pd.to_datetime(df['date'], format=_LOG_DATE_FORMAT)
+    df['process'] = df['process'].astype('int64')
+    df['line'] = df['line'].astype('int64')
+    df['level'] = df['level'].astype('category')
+    return df
+
+
 class RFC4180(object):
     delimiter = ','
     quotechar = '"'
@@ -153,72 +519,151 @@ class RFC4180(object):
     quoting = csv.QUOTE_MINIMAL
 
 
-def link_easy(sid):
+def link_easy(sid, base_url=EASY_DATASET_URL):
     """
     Creates an html link to a dataset page in Easy.
 
     :param sid: a dataset id
+    :param base_url: url of the dataset pages, default EASY_DATASET_URL
 
     :return: link to the page for that dataset
     """
-    prefix = 'https://easy.dans.knaw.nl/ui/datasets/id/'
-    return '<a target="_blank" href="{}{}">{}</a>'.format(prefix, sid, sid)
+    return '<a target="_blank" href="{}{}">{}</a>'.format(base_url, sid, sid)
 
 
-def excel_link_easy(sid):
-    formula = '=HYPERLINK("https://easy.dans.knaw.nl/ui/datasets/id/{}", "{}")'.format(sid, sid)
+def excel_link_easy(sid, base_url=EASY_DATASET_URL):
+    formula = '=HYPERLINK("{}{}", "{}")'.format(base_url, sid, sid)
     return formula
 
 
-def link_doi(doi):
-    return '<a target="_blank" href="https://doi.org/{}">{}</a>'.format(doi, doi)
+def link_doi(doi, base_url=DOI_URL):
+    return '<a target="_blank" href="{}{}">{}</a>'.format(base_url, doi, doi)
 
 
-def excel_link_doi(doi):
-    formula = '=HYPERLINK("https://doi.org/{}", "{}")'.format(doi, doi)
+def excel_link_doi(doi, base_url=DOI_URL):
+    formula = '=HYPERLINK("{}{}", "{}")'.format(base_url, doi, doi)
     return formula
 
 
-def link_fedora_file(sid):
+def link_fedora_file(sid, base_url=FEDORA_OBJECTS_URL):
     """
     Creates an html link tag to a file in Fedora.
 
     :param sid: a file id
+    :param base_url: url of the Fedora objects, default FEDORA_OBJECTS_URL
 
     :return: link to the file content
     """
-    return '<a href="http://easy01.dans.knaw.nl:8080/fedora/objects/{}/datastreams/EASY_FILE/content" target="_blank">{}</a>'\
-        .format(sid, sid)
+    return '<a href="{}{}/datastreams/EASY_FILE/content" target="_blank">{}</a>'.format(base_url, sid, sid)
 
 
-def excel_fedora_file(sid):
-    formula = '=HYPERLINK("http://easy01.dans.knaw.nl:8080/fedora/objects/{}/datastreams/EASY_FILE/content", "{}")'.format(
-        sid, sid)
+def excel_fedora_file(sid, base_url=FEDORA_OBJECTS_URL):
+    formula = '=HYPERLINK("{}{}/datastreams/EASY_FILE/content", "{}")'.format(base_url, sid, sid)
     return formula
 
 
-def link_fedora_file_md(sid):
+def link_fedora_file_md(sid, base_url=FEDORA_OBJECTS_URL):
     """
     Creates a html link tag to the EASY_FILE_METADATA of a file with the given sid.
 
     http://easy01.dans.knaw.nl:8080/fedora/objects/easy-file:6364865/datastreams/EASY_FILE_METADATA/content
 
     :param sid:  a file id
+    :param base_url: url of the Fedora objects, default FEDORA_OBJECTS_URL
     :return: link to the file metadata
     """
-    return '<a href="http://easy01.dans.knaw.nl:8080/fedora/objects/{}/datastreams/EASY_FILE_METADATA/content" target="_blank">{}</a>'\
-        .format(sid, sid)
+    return '<a href="{}{}/datastreams/EASY_FILE_METADATA/content" target="_blank">{}</a>'.format(base_url, sid, sid)
 
 
-def excel_fedora_file_md(sid):
-    formula = '=HYPERLINK("http://easy01.dans.knaw.nl:8080/fedora/objects/{}/datastreams/EASY_FILE_METADATA/content", "{}")'.format(sid, sid)
+def excel_fedora_file_md(sid, base_url=FEDORA_OBJECTS_URL):
+    formula = '=HYPERLINK("{}{}/datastreams/EASY_FILE_METADATA/content", "{}")'.format(base_url, sid, sid)
     return formula
 
 
-def link_fedora_ds_license(sid):
+def link_fedora_ds_license(sid, base_url=FEDORA_OBJECTS_URL):
     # http://easy01.dans.knaw.nl:8080/fedora/objects/easy-dataset:18142/datastreams/DATASET_LICENSE/content
-    return '<a href="http://easy01.dans.knaw.nl:8080/fedora/objects/{}/datastreams/DATASET_LICENSE/content" target="_blank">{}</a>'\
-        .format(sid, sid)
+    return '<a href="{}{}/datastreams/DATASET_LICENSE/content" target="_blank">{}</a>'.format(base_url, sid, sid)
+
+
+def _fill_series(ids, template):
+    """
+    Fill a %-template with two %s placeholders with each id, like the scalar link functions do with str.format.
+    The template is built once per column, so per id only a single C-level % operation remains.
+
+    :param ids: Series, array or list of ids
+    :param template: the template; a literal % must be written as %%
+    :return: Series of strings, with the index and name of ids if it is a Series
+    """
+    import pandas as pd
+
+    index = ids.index if isinstance(ids, pd.Series) else None
+    name = ids.name if isinstance(ids, pd.Series) else None
+    values = ids.tolist() if hasattr(ids, 'tolist') else list(ids)
+    return pd.Series([template % (value, value) for value in values], index=index, name=name)
+
+
+def _literal(text):
+    return text.replace('%', '%%')
+
+
+def link_easy_series(sids, base_url=EASY_DATASET_URL):
+    """
+    Creates html links to dataset pages in Easy for a whole column. Same result as `link_easy` per id.
+
+    :param sids: Series or array of dataset ids
+    :param base_url: url of the dataset pages, default EASY_DATASET_URL
+    :return: Series of links, with the index and name of sids if it is a Series
+    """
+    return _fill_series(sids, '<a target="_blank" href="' + _literal(base_url) + '%s">%s</a>')
+
+
+def excel_link_easy_series(sids, base_url=EASY_DATASET_URL):
+    return _fill_series(sids, '=HYPERLINK("' + _literal(base_url) + '%s", "%s")')
+
+
+def link_doi_series(dois, base_url=DOI_URL):
+    return _fill_series(dois, '<a target="_blank" href="' + _literal(base_url) + '%s">%s</a>')
+
+
+def excel_link_doi_series(dois, base_url=DOI_URL):
+    return _fill_series(dois, '=HYPERLINK("' + _literal(base_url) + '%s", "%s")')
+
+
+def _fedora_link_series(sids, datastream, base_url):
+    return _fill_series(sids, '<a href="' + _literal(base_url) + '%s/datastreams/' + datastream
+                        + '/content" target="_blank">%s</a>')
+
+
+def _excel_fedora_series(sids, datastream, base_url):
+    return _fill_series(sids, '=HYPERLINK("' + _literal(base_url) + '%s/datastreams/' + datastream
+                        + '/content", "%s")')
+
+
+def link_fedora_file_series(sids, base_url=FEDORA_OBJECTS_URL):
+    """
+    Creates html link tags to files in Fedora for a whole column. Same result as `link_fedora_file` per id.
+
+    :param sids: Series or array of file ids
+    :param base_url: url of the Fedora objects, default FEDORA_OBJECTS_URL
+    :return: Series of links, with the index and name of sids if it is a Series
+    """
+    return _fedora_link_series(sids, 'EASY_FILE', base_url)
+
+
+def excel_fedora_file_series(sids, base_url=FEDORA_OBJECTS_URL):
+    return _excel_fedora_series(sids, 'EASY_FILE', base_url)
+
+
+def link_fedora_file_md_series(sids, base_url=FEDORA_OBJECTS_URL):
+    return _fedora_link_series(sids, 'EASY_FILE_METADATA', base_url)
+
+
+def excel_fedora_file_md_series(sids, base_url=FEDORA_OBJECTS_URL):
+    return _excel_fedora_series(sids, 'EASY_FILE_METADATA', base_url)
+
+
+def link_fedora_ds_license_series(sids, base_url=FEDORA_OBJECTS_URL):
+    return _fedora_link_series(sids, 'DATASET_LICENSE', base_url)
 
 
 def format_size(size_in_bytes, leading=8, trailing=1):
@@ -248,6 +693,95 @@ def format_timestamp(timestamp):
     return format_datetime(datetime.datetime.fromtimestamp(timestamp))
 
 
+def _as_series(values):
+    import pandas as pd
+
+    return values if isinstance(values, pd.Series) else pd.Series(values)
+
+
+def format_size_series(sizes, leading=8, trailing=1):
+    """
+    Formats the given sizes like `format_size`, for a whole column at once. The unit of each size is chosen with
+    vectorized thresholds and each unit bucket is formatted with one precomputed %-format, unit included.
+
+    :param sizes: Series or array of sizes in bytes
+    :param leading: width of the number, default 8
+    :param trailing: number of decimals for sizes over 1024 bytes, default 1
+    :return: Series of strings; missing sizes stay missing
+    """
+    import numpy as np
+    import pandas as pd
+
+    sizes = _as_series(sizes)
+    values = sizes.to_numpy(dtype=float, na_value=np.nan)
+    result = np.full(len(values), np.nan, dtype=object)
+    gb = values >= 1024 * 1024 * 1024
+    mb = (values >= 1024 * 1024) & ~gb
+    kb = (values >= 1024) & ~(gb | mb)
+    b = values < 1024
+    small = values <= 1024
+    for unit, divisor, mask in ((' GB', 1024 * 1024 * 1024, gb), (' MB', 1024 * 1024, mb), (' KB', 1024, kb),
+                                (' B', 1, b)):
+        for decimals, selected in ((0, mask & small), (trailing, mask & ~small)):
+            if selected.any():
+                # '%8.1f' formats like '{:8.1f}'; a negative width is only a sign option for str.format
+                spec = '%' + str(abs(leading)) + '.' + str(decimals) + 'f' + unit
+                result[selected] = [spec % value for value in (values[selected] / divisor).tolist()]
+    return pd.Series(result, index=sizes.index, name=sizes.name)
+
+
+def format_datetime_series(dates):
+    """
+    Formats the given dates like `format_datetime`, for a whole column at once.
+
+    :param dates: Series or array of datetimes
+    :return: Series of strings; missing dates stay missing
+    """
+    import pandas as pd
+
+    dates = _as_series(dates)
+    try:
+        converted = pd.to_datetime(dates)
+    except (TypeError, ValueError):
+        # i.e. datetimes with different UTC offsets, which have no common dtype; format each wall-clock time
+        return dates.map(format_datetime, na_action='ignore')
+    return converted.dt.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def format_timestamp_series(timestamps):
+    """
+    Formats the given POSIX timestamps like `format_timestamp`, in local time, for a whole column at once.
+    The UTC offset is asked from the C library, like datetime.fromtimestamp does, but only once per distinct hour.
+
+    :param timestamps: Series or array of timestamps in seconds, i.e. st_mtime
+    :return: Series of strings; missing timestamps stay missing
+    """
+    import numpy as np
+    import pandas as pd
+
+    timestamps = _as_series(timestamps)
+    values = timestamps.to_numpy(dtype=float, na_value=np.nan)
+    valid = ~np.isnan(values)
+    # round to microseconds first, like datetime.fromtimestamp does, then drop the fraction
+    seconds = np.round(values[valid] * 1e6).astype('int64') // 1000000
+    result = np.full(len(values), np.nan, dtype=object)
+    if len(seconds) == 0:
+        return pd.Series(result, index=timestamps.index, name=timestamps.name)
+    hours, inverse = np.unique(seconds // 3600 * 3600, return_inverse=True)
+    edges = np.union1d(hours, hours + 3600)
+    edge_offsets = np.array([time.localtime(edge).tm_gmtoff for edge in edges.tolist()], dtype='int64')
+    offsets = edge_offsets[np.searchsorted(edges, hours)]
+    local = seconds + offsets[inverse]
+    # the offset changes somewhere within an hour that has a different offset than the next hour;
+    # historical offsets are not always whole hours, so those are done one by one
+    changing = (offsets != edge_offsets[np.searchsorted(edges, hours + 3600)])[inverse]
+    if changing.any():
+        local[changing] = [second + time.localtime(second).tm_gmtoff for second in seconds[changing].tolist()]
+    text = np.datetime_as_string(local.astype('datetime64[s]'), unit='s')
+    result[valid] = np.char.replace(text, 'T', ' ')
+    return pd.Series(result, index=timestamps.index, name=timestamps.name)
+
+
 def link(path, caption=None, color=None, extra=None):
     """
     Display relative links to the file in 'path'.
@@ -258,6 +792,9 @@ def link(path, caption=None, color=None, extra=None):
     :param extra: extra text to be inserted before the caption, default None
     :return: parameter path for chaining
     """
+    from IPython.core.display import HTML
+    from IPython.display import display
+
     _blank = ['.html', '.txt', '.json', '.csv']
     _ccoll = {'.xlsx': 'green',
               '.html': 'blue',
@@ -339,6 +876,9 @@ def toggle_code_cells(initial_show=True):
     Displays a floating button to toggle the visibility of code cells.
     :return: None
     """
+    from IPython.core.display import HTML
+    from IPython.display import display
+
     show = 'false' if initial_show else 'true'
     start = '<script>code_show={};'.format(show)
     tags = start + """
@@ -380,6 +920,9 @@ def messages():
     the content of the url /ta/tech/msg/omni_present_message.txt
     :return: None
     """
+    from IPython.core.display import HTML
+    from IPython.display import display
+
     script = ('\n'
               '    <div id="omni_present_message">\n'
               '    </div>\n'
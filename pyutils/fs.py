@@ -4,9 +4,10 @@
 import os
 import collections
 import hashlib
-import pandas as pd
 from functools import partial
 
+from pyutils import timing
+
 
 def list_extensions(folder='.', ext_filter=lambda ext: True, path_filter=lambda path: True):
     """
@@ -19,20 +20,26 @@ def list_extensions(folder='.', ext_filter=lambda ext: True, path_filter=lambda
 
     :return: a dataframe listing the found file extensions, count, size (in bytes and Mb)
     """
+    import pandas as pd
+
     if not os.path.exists(folder):
         raise FileNotFoundError('Not found: ' + folder)
     pd.options.display.float_format = '{:,.2f}'.format
     extensions = collections.defaultdict(list)
 
-    for path, dirs, files in os.walk(folder):
-        for filename in files:
-            ext = os.path.splitext(filename)[1].lower()
-            if ext_filter(ext) and path_filter(path) and not filename.startswith('.'):
-                if not ext in extensions:
-                    extensions[ext] = [0, 0]
-                extensions[ext][0] += 1
-                statinfo = os.stat(os.path.join(path, filename))
-                extensions[ext][1] += statinfo.st_size
+    with timing.timer('fs.list_extensions') as t:
+        for path, dirs, files in os.walk(folder):
+            for filename in files:
+                ext = os.path.splitext(filename)[1].lower()
+                if ext_filter(ext) and path_filter(path) and not filename.startswith('.'):
+                    if not ext in extensions:
+                        extensions[ext] = [0, 0]
+                    extensions[ext][0] += 1
+                    statinfo = os.stat(os.path.join(path, filename))
+                    extensions[ext][1] += statinfo.st_size
+        if timing.is_enabled():
+            t.add(items=sum(count for count, size in extensions.values()),
+                  nbytes=sum(size for count, size in extensions.values()))
 
     df = pd.DataFrame(extensions)
     if len(extensions) > 0:
@@ -57,12 +64,14 @@ def find_files(folder='.', ext_filter=lambda ext: True, path_filter=lambda path:
     if not os.path.exists(folder):
         raise FileNotFoundError('Not found: ' + folder)
     found_files = []
-    for path, dirs, files in os.walk(folder):
-        for filename in files:
-            if not(exclude_hidden and filename.startswith('.')):
-                ext = os.path.splitext(filename)[1].lower()
-                if ext_filter(ext) and path_filter(path):
-                    found_files.append(os.path.join(path, filename))
+    with timing.timer('fs.find_files') as t:
+        for path, dirs, files in os.walk(folder):
+            for filename in files:
+                if not(exclude_hidden and filename.startswith('.')):
+                    ext = os.path.splitext(filename)[1].lower()
+                    if ext_filter(ext) and path_filter(path):
+                        found_files.append(os.path.join(path, filename))
+        t.add(items=len(found_files))
 
     return found_files
 
@@ -74,10 +83,11 @@ def sha1_for_file(filename, block_size=2**14):
     Optional block_size parameter controls memory used to do MD5 calculation.
     This should be a multiple of 128 bytes.
     """
-    with open(filename, mode='rb') as f:
+    with timing.timer('fs.sha1_for_file') as t, open(filename, mode='rb') as f:
         d = hashlib.sha1()
         for buf in iter(partial(f.read, block_size), b''):
             d.update(buf)
+        t.add(items=1, nbytes=f.tell())
     return d.hexdigest()
 
 
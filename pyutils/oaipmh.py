@@ -1,6 +1,7 @@
-import requests
 import xml.etree.ElementTree as ET
 
+from pyutils import timing
+
 NS_OAI = {"oai": "http://www.openarchives.org/OAI/2.0/"}
 
 
@@ -11,15 +12,20 @@ def id_generator(set_name=None):
     https://easy.dans.knaw.nl/oai/?verb=ListIdentifiers&metadataPrefix=oai_dc or
     https://easy.dans.knaw.nl/oai/?verb=ListIdentifiers&metadataPrefix=oai_dc&set=D30000:D37000
     """
+    import requests
+
     url = 'https://easy.dans.knaw.nl/oai/?verb=ListIdentifiers&metadataPrefix=oai_datacite'
     if set_name:
         url += ('&set=' + set_name)
     print(url)
-    response = requests.get(url)
-    text = str(response.content, 'utf-8', errors='replace')
-    # print(text)
-    root = ET.fromstring(text)
-    ids = root.find('oai:ListIdentifiers', NS_OAI)
+    with timing.timer('oaipmh.page') as t:
+        response = requests.get(url)
+        text = str(response.content, 'utf-8', errors='replace')
+        # print(text)
+        root = ET.fromstring(text)
+        ids = root.find('oai:ListIdentifiers', NS_OAI)
+        if timing.is_enabled():
+            t.add(items=len(ids.findall('oai:header', NS_OAI)), nbytes=len(response.content))
     count = 0
     resumption_token = None
     for child in list(ids):
@@ -31,10 +37,14 @@ def id_generator(set_name=None):
     # print('\r', count, resumption_token, end='', flush=True)
 
     while resumption_token:
-        result = requests.get('https://easy.dans.knaw.nl/oai/?verb=ListIdentifiers&resumptionToken=' + resumption_token)
+        with timing.timer('oaipmh.page') as t:
+            result = requests.get('https://easy.dans.knaw.nl/oai/?verb=ListIdentifiers&resumptionToken='
+                                  + resumption_token)
+            root = ET.fromstring(result.text)
+            ids = root.find('oai:ListIdentifiers', NS_OAI)
+            if timing.is_enabled():
+                t.add(items=len(ids.findall('oai:header', NS_OAI)), nbytes=len(result.content))
         resumption_token = None
-        root = ET.fromstring(result.text)
-        ids = root.find('oai:ListIdentifiers', NS_OAI)
         for child in list(ids):
             if child.tag == '{http://www.openarchives.org/OAI/2.0/}header':
                 yield child.find('{http://www.openarchives.org/OAI/2.0/}identifier').text[22:]
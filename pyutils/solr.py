@@ -1,8 +1,9 @@
 #! /usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import pandas as pd
-import urllib
+import urllib.parse
+
+from pyutils import timing
 
 
 def search(query, start=0, rows=200):
@@ -15,10 +16,15 @@ def search(query, start=0, rows=200):
 
     :return: Pandas.DataFrame with results
     """
+    import pandas as pd
+
     q = urllib.parse.quote(query)
     url = 'http://easy01.dans.knaw.nl:8080/solr/datasets/select?wt=csv&start={}&rows={}&q={}' \
         .format(start, rows, q)
-    return pd.read_csv(url)
+    with timing.timer('solr.search') as t:
+        df = pd.read_csv(url)
+        t.add(items=len(df))
+    return df
 
 
 def search_all(query):
@@ -29,6 +35,8 @@ def search_all(query):
 
     :return: Pandas.DataFrame with results
     """
+    import pandas as pd
+
     start = 0
     rows = 200
     df = search(query, start, rows)
@@ -1,4 +1,15 @@
+import datetime
+import gzip
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
 import unittest
+
+import pandas as pd
+
 import pyutils.format as fm
 
 
@@ -23,3 +34,238 @@ class TestFormat(unittest.TestCase):
         print(fm.format_size(1024 * 1024 * 1024, leading=-1, trailing=2))
 
 
+class TestReadLog(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.folder, 'pyu.log')
+        # three files with 100 records each, one per minute; '.2' is the oldest backup
+        for i, path in enumerate([self.log_file + '.2', self.log_file + '.1', self.log_file]):
+            with open(path, 'w', encoding='utf-8') as f:
+                for j in range(100):
+                    minute = i * 100 + j
+                    when = datetime.datetime(2019, 3, 1) + datetime.timedelta(minutes=minute)
+                    level = 'ERROR' if minute % 10 == 0 else 'DEBUG'
+                    function = 'harvest' if minute % 2 == 0 else 'scan'
+                    msg = 'message {}\nsecond line'.format(minute) if minute % 7 == 0 else 'message {}'.format(minute)
+                    row = [when.strftime('%Y-%m-%d %H:%M:%S.%f'), 'MainThread', 42, level, 'test.py', minute,
+                           function, msg, '/tmp/test.py']
+                    f.write(','.join('"{}"'.format(v) for v in row) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_log_files(self):
+        paths = [path for path, first in fm.log_files(self.log_file)]
+        self.assertEqual([self.log_file + '.2', self.log_file + '.1', self.log_file], paths)
+
+    def test_read_log(self):
+        df = fm.read_log(self.log_file)
+        self.assertEqual(300, len(df))
+        self.assertEqual(fm.LOG_COLUMNS, list(df.columns))
+        self.assertTrue(df['date'].is_monotonic_increasing)
+        self.assertEqual('datetime64', str(df['date'].dtype)[:10])
+        self.assertEqual('int64', str(df['line'].dtype))
+        self.assertEqual('message 7\nsecond line', df['msg'][7])
+
+    def test_read_log_window(self):
+        df = fm.read_log(self.log_file, start='2019-03-01 01:35', end=datetime.datetime(2019, 3, 1, 3, 25))
+        self.assertEqual(list(range(95, 206)), list(df['line']))
+
+    def test_read_log_filters(self):
+        df = fm.read_log(self.log_file, start='2019-03-01 01:00', levels='error', functions=['harvest'])
+        self.assertEqual(list(range(60, 300, 10)), list(df['line']))
+        df = fm.read_log(self.log_file, levels=[logging.ERROR], functions='scan')
+        self.assertEqual(0, len(df))
+
+    def test_read_log_file_removed(self):
+        read_log_window = fm._read_log_window
+
+        def remove_and_read(path, start, end, encoding):
+            if path == self.log_file + '.1':
+                os.remove(path)
+            return read_log_window(path, start, end, encoding)
+
+        fm._read_log_window = remove_and_read
+        try:
+            df = fm.read_log(self.log_file)
+        finally:
+            fm._read_log_window = read_log_window
+        self.assertEqual(list(range(100)) + list(range(200, 300)), list(df['line']))
+
+    def test_read_log_out_of_order(self):
+        # records of threads that are swapped by up to 30 ms, in a compressed backup and the active file
+        log_file = os.path.join(self.folder, 'threads.log')
+        rnd = random.Random(26)
+        begin = datetime.datetime(2019, 3, 1, 10)
+        stamps = [begin + datetime.timedelta(milliseconds=10 * i + rnd.randint(0, 30)) for i in range(2000)]
+        lines = []
+        for i, when in enumerate(stamps):
+            row = [when.strftime('%Y-%m-%d %H:%M:%S.%f'), 'Thread-{}'.format(i % 4), 42, 'INFO', 'test.py', i,
+                   'work', 'message {}'.format(i), '/tmp/test.py']
+            lines.append(','.join('"{}"'.format(v) for v in row) + '\n')
+        with gzip.open(log_file + '.20190301-100010-000000.gz', 'wt', encoding='utf-8') as f:
+            f.writelines(lines[:1000])
+        with open(log_file, 'w', encoding='utf-8') as f:
+            f.writelines(lines[1000:])
+
+        for k in range(100):
+            start = begin + datetime.timedelta(milliseconds=rnd.randint(0, 20500))
+            end = start + datetime.timedelta(milliseconds=rnd.choice([0, 2, 15, 200, 3000]))
+            expected = [i for i, when in enumerate(stamps) if start <= when <= end]
+            df = fm.read_log(log_file, start=start, end=end)
+            self.assertEqual(expected, list(df['line']), (start, end))
+            self.assertTrue(((df['date'] >= start) & (df['date'] <= end)).all())
+
+    def test_read_log_empty_window(self):
+        df = fm.read_log(self.log_file, start='2020-01-01')
+        self.assertEqual(0, len(df))
+        self.assertEqual(fm.LOG_COLUMNS, list(df.columns))
+
+
+class TestCompressingFileHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.folder, 'pyu.log')
+        self.logger = logging.getLogger('test_compressing_file_handler')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+        shutil.rmtree(self.folder)
+
+    def add_handler(self, **kwargs):
+        handler = fm.CompressingFileHandler(self.log_file, encoding='utf-8', **kwargs)
+        handler.setFormatter(fm.CsvFormatter())
+        self.logger.addHandler(handler)
+        return handler
+
+    def test_size_rollover(self):
+        handler = self.add_handler(max_bytes=2000, backup_count=3)
+        for i in range(100):
+            self.logger.info('message {}'.format(i))
+        self.logger.removeHandler(handler)
+        handler.close()
+        segments = sorted(os.listdir(self.folder))
+        self.assertEqual(4, len(segments))
+        self.assertEqual('pyu.log', segments[0])
+        self.assertTrue(all(segment.endswith('.gz') for segment in segments[1:]))
+        df = fm.read_log(self.log_file)
+        self.assertTrue(df['date'].is_monotonic_increasing)
+        self.assertEqual('message 99', df['msg'].iloc[-1])
+        gz = pd.read_csv(os.path.join(self.folder, segments[1]), header=None, names=fm.LOG_COLUMNS)
+        self.assertEqual(list(df['msg'][:len(gz)]), list(gz['msg']))
+
+    def test_time_rollover(self):
+        handler = self.add_handler(rotate_interval=datetime.timedelta(hours=1), compression='bz2')
+        self.assertEqual(0, handler.rollover_at % 3600)
+        self.logger.info('before')
+        handler.rollover_at = time.time() - 1
+        self.logger.info('after')
+        handler.close()
+        segments = sorted(os.listdir(self.folder))
+        self.assertEqual(2, len(segments))
+        self.assertTrue(segments[1].endswith('.bz2'))
+        self.assertEqual(['before', 'after'], list(fm.read_log(self.log_file)['msg']))
+        # segments are named in UTC
+        named = datetime.datetime.strptime(segments[1][len('pyu.log.'):-len('.bz2')], '%Y%m%d-%H%M%S-%f')
+        utc_now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        self.assertLess(abs((utc_now - named).total_seconds()), 60)
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            fm.CompressingFileHandler(self.log_file, compression='zip')
+
+
+class TestLinkSeries(unittest.TestCase):
+
+    ids = pd.Series(['easy-dataset:1', 'easy-file:6364865', 42, 1.5, None, float('nan'), '10.17026/dans-x'],
+                    index=range(10, 17), name='sid')
+
+    def test_series_equal_scalar(self):
+        functions = [(fm.link_easy, fm.link_easy_series),
+                     (fm.excel_link_easy, fm.excel_link_easy_series),
+                     (fm.link_doi, fm.link_doi_series),
+                     (fm.excel_link_doi, fm.excel_link_doi_series),
+                     (fm.link_fedora_file, fm.link_fedora_file_series),
+                     (fm.excel_fedora_file, fm.excel_fedora_file_series),
+                     (fm.link_fedora_file_md, fm.link_fedora_file_md_series),
+                     (fm.excel_fedora_file_md, fm.excel_fedora_file_md_series),
+                     (fm.link_fedora_ds_license, fm.link_fedora_ds_license_series)]
+        for scalar, series in functions:
+            expected = self.ids.apply(scalar)
+            actual = series(self.ids)
+            self.assertEqual(list(expected), list(actual), scalar.__name__)
+            self.assertEqual(list(self.ids.index), list(actual.index))
+            self.assertEqual(list(expected), list(series(self.ids.values)))
+
+    def test_base_url(self):
+        self.assertEqual('<a target="_blank" href="http://localhost/ds/1">1</a>',
+                         fm.link_easy(1, base_url='http://localhost/ds/'))
+        self.assertEqual(['<a target="_blank" href="http://localhost/ds/1">1</a>'],
+                         list(fm.link_easy_series([1], base_url='http://localhost/ds/')))
+        self.assertEqual([fm.excel_fedora_file('50%', base_url='http://localhost/%20/')],
+                         list(fm.excel_fedora_file_series(['50%'], base_url='http://localhost/%20/')))
+
+
+class TestFormatSeries(unittest.TestCase):
+
+    def test_format_size_series(self):
+        sizes = pd.Series([0, 1, 100, 1023, 1024, 1025, 10000, 1000000, 1024 * 1024, 100000000,
+                           1024 * 1024 * 1024, 10000000000, -5], index=range(100, 113))
+        for leading, trailing in ((8, 1), (8, 5), (-1, 2), (0, 0), (12, 3)):
+            expected = sizes.apply(fm.format_size, leading=leading, trailing=trailing)
+            actual = fm.format_size_series(sizes, leading=leading, trailing=trailing)
+            self.assertEqual(list(expected), list(actual))
+            self.assertEqual(list(sizes.index), list(actual.index))
+
+    def test_format_size_series_nan(self):
+        actual = fm.format_size_series([1.0, float('nan'), None, 2048])
+        self.assertEqual([fm.format_size(1), fm.format_size(2048)], list(actual[[0, 3]]))
+        self.assertTrue(actual[[1, 2]].isna().all())
+
+    def test_format_datetime_series(self):
+        dates = [datetime.datetime(2019, 3, 1, 10, 5, 7, 999999), datetime.datetime(1999, 12, 31, 23, 59, 59)]
+        self.assertEqual([fm.format_datetime(date) for date in dates], list(fm.format_datetime_series(dates)))
+        self.assertTrue(fm.format_datetime_series([None]).isna().all())
+
+    def test_format_datetime_series_mixed_offsets(self):
+        amsterdam = datetime.timezone(datetime.timedelta(hours=1))
+        kolkata = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+        dates = pd.Series([datetime.datetime(2019, 3, 1, 10, 5, 7, tzinfo=amsterdam),
+                           datetime.datetime(2019, 3, 1, 10, 5, 7, tzinfo=kolkata), None], dtype=object)
+        self.assertEqual([fm.format_datetime(dates[0]), fm.format_datetime(dates[1])],
+                         list(fm.format_datetime_series(dates)[:2]))
+        self.assertTrue(pd.isna(fm.format_datetime_series(dates)[2]))
+        self.assertEqual([fm.format_datetime(dates[0])], list(fm.format_datetime_series(dates[:1])))
+
+    def test_format_timestamp_series(self):
+        timestamps = pd.Series([0, 1553990400.5, 1572137999, 1572141599, 1.9999999, time.time()])
+        self.assertEqual(list(timestamps.apply(fm.format_timestamp)), list(fm.format_timestamp_series(timestamps)))
+        self.assertTrue(fm.format_timestamp_series([float('nan')]).isna().all())
+
+    @unittest.skipUnless(hasattr(time, 'tzset'), 'needs time.tzset')
+    def test_format_timestamp_series_time_zones(self):
+        # pre-1970 times with offsets that are not whole hours, DST boundaries and every second of some hours
+        # in which the offset changes
+        timestamps = pd.Series([-1e9, -1e9 + 0.9999996, -2e9, -1, 0, 5e8, 1553993999, 1553994000, 1572137999,
+                                1572138000, 1572141599, 1572141600, 1e9, float('nan')]
+                               + list(range(-1025749000, -1025741800, 7)) + list(range(1572134400, 1572145200, 11)))
+        tz = os.environ.get('TZ')
+        try:
+            for zone in ('Europe/Amsterdam', 'America/Sao_Paulo', 'Asia/Kolkata', 'UTC'):
+                os.environ['TZ'] = zone
+                time.tzset()
+                expected = [None if pd.isna(ts) else fm.format_timestamp(ts) for ts in timestamps]
+                actual = [None if pd.isna(text) else text for text in fm.format_timestamp_series(timestamps)]
+                self.assertEqual(expected, actual, zone)
+        finally:
+            if tz is None:
+                del os.environ['TZ']
+            else:
+                os.environ['TZ'] = tz
+            time.tzset()
@@ -0,0 +1,38 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODULES = ['pyutils.collect', 'pyutils.format', 'pyutils.fs', 'pyutils.oaipmh', 'pyutils.solr', 'pyutils.timing']
+# heavy dependencies that should only be imported on first use
+HEAVY = ['pandas', 'numpy', 'IPython', 'requests', 'dateutil']
+# cumulative import time per submodule in microseconds, as reported by -X importtime;
+# importing pandas alone takes several hundreds of milliseconds
+BUDGET = 75000
+
+
+def run_python(*args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable] + list(args), cwd=ROOT, env=env, capture_output=True, text=True,
+                          check=True)
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_no_heavy_imports(self):
+        for module in MODULES:
+            code = 'import sys, {}; print(" ".join(sorted(sys.modules)))'.format(module)
+            loaded = run_python('-c', code).stdout.split()
+            self.assertEqual([], [heavy for heavy in HEAVY if heavy in loaded], module)
+
+    def test_import_time_budget(self):
+        for module in MODULES:
+            stderr = run_python('-X', 'importtime', '-c', 'import ' + module).stderr
+            match = re.search(r'^import time:\s+\d+ \|\s+(\d+) \| {}$'.format(re.escape(module)), stderr, re.M)
+            self.assertIsNotNone(match, module)
+            cumulative = int(match.group(1))
+            self.assertLess(cumulative, BUDGET, '{} took {} us to import'.format(module, cumulative))
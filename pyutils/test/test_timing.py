@@ -0,0 +1,83 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging
+import os
+import time
+import unittest
+
+from pyutils import format as fm
+from pyutils import fs
+from pyutils import timing
+
+
+class TestTiming(unittest.TestCase):
+
+    def setUp(self):
+        timing.reset()
+        timing.enable()
+
+    def tearDown(self):
+        timing.disable()
+        timing.reset()
+
+    def test_timer(self):
+        for i in range(10):
+            with timing.timer('test.timer') as t:
+                time.sleep(0.001)
+                t.add(items=2, nbytes=100)
+        stats = timing.summary()['test.timer']
+        self.assertEqual(10, stats['count'])
+        self.assertEqual(20, stats['items'])
+        self.assertEqual(1000, stats['bytes'])
+        self.assertTrue(1 <= stats['min_ms'] <= stats['p50_ms'] <= stats['p99_ms'] <= stats['max_ms'])
+
+    def test_timed(self):
+        @timing.timed()
+        def work(x):
+            return x * 2
+
+        self.assertEqual(4, work(2))
+        self.assertEqual('work', work.__name__)
+        self.assertEqual(1, timing.summary()[__name__ + '.TestTiming.test_timed.<locals>.work']['count'])
+
+    def test_timed_bare(self):
+        @timing.timed
+        def work(x):
+            return x * 2
+
+        self.assertEqual(4, work(2))
+        self.assertEqual(1, timing.summary()[__name__ + '.TestTiming.test_timed_bare.<locals>.work']['count'])
+        with self.assertRaises(TypeError):
+            timing.timed(42)
+
+    def test_disabled(self):
+        timing.disable()
+        with timing.timer('test.disabled') as t:
+            t.add(items=1)
+        timing.count('test.disabled')
+        timing.timed('test.disabled')(lambda: None)()
+        self.assertEqual({}, timing.summary())
+
+    def test_count(self):
+        timing.count('test.count', nbytes=10)
+        timing.count('test.count', items=3)
+        stats = timing.summary()['test.count']
+        self.assertEqual(0, stats['count'])
+        self.assertEqual(4, stats['items'])
+        self.assertEqual(10, stats['bytes'])
+
+    def test_fs(self):
+        fs.sha1_for_file(__file__)
+        fs.find_files(os.path.dirname(os.path.abspath(__file__)))
+        stats = timing.summary()
+        self.assertEqual(os.path.getsize(__file__), stats['fs.sha1_for_file']['bytes'])
+        self.assertTrue(stats['fs.find_files']['items'] > 0)
+
+    def test_log_summary(self):
+        timing.count('test.log')
+        with self.assertLogs('pyutils.timing', logging.INFO) as logs:
+            timing.log_summary()
+        self.assertTrue(logs.output[0].startswith('INFO:pyutils.timing:test.log count=0'))
+
+    def test_profile(self):
+        self.assertEqual(3, fm.profile(sum, [1, 2], profile_limit=5))
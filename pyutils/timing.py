@@ -0,0 +1,251 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import functools
+import logging
+import threading
+import time
+
+_log = logging.getLogger(__name__)
+_enabled = False
+_lock = threading.Lock()
+_stats = {}
+
+# latencies are kept in buckets of powers of two microseconds; bucket i holds latencies below 2 ** i microseconds
+_BUCKETS = 48
+
+
+class Stat(object):
+    """
+    Latency histogram and item/byte counters for one instrumented name.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.items = 0
+        self.bytes = 0
+        self.buckets = [0] * _BUCKETS
+
+    def record(self, elapsed, items=0, nbytes=0):
+        """
+        Record one measurement.
+
+        :param elapsed: elapsed time in seconds, None for a count without latency
+        :param items: number of items processed
+        :param nbytes: number of bytes processed
+        :return: None
+        """
+        self.items += items
+        self.bytes += nbytes
+        if elapsed is None:
+            return
+        self.count += 1
+        self.total += elapsed
+        if self.min is None or elapsed < self.min:
+            self.min = elapsed
+        if self.max is None or elapsed > self.max:
+            self.max = elapsed
+        self.buckets[min(int(elapsed * 1e6).bit_length(), _BUCKETS - 1)] += 1
+
+    def quantile(self, q):
+        """
+        Estimate a latency quantile from the histogram.
+
+        :param q: the quantile, between 0 and 1
+        :return: upper bound of the bucket that holds the quantile, in seconds, capped by max; None if nothing recorded
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min((2 ** i) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        """
+        :return: dict with count, latencies in milliseconds and throughput per second
+        """
+        ms = lambda seconds: None if seconds is None else seconds * 1000
+        per_second = lambda amount: amount / self.total if self.total > 0 else None
+        return {'count': self.count,
+                'total_ms': ms(self.total),
+                'mean_ms': ms(self.total / self.count) if self.count else None,
+                'min_ms': ms(self.min),
+                'p50_ms': ms(self.quantile(0.5)),
+                'p90_ms': ms(self.quantile(0.9)),
+                'p99_ms': ms(self.quantile(0.99)),
+                'max_ms': ms(self.max),
+                'items': self.items,
+                'bytes': self.bytes,
+                'items_per_s': per_second(self.items),
+                'bytes_per_s': per_second(self.bytes)}
+
+
+class _Timer(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.nbytes = 0
+        self.start = None
+
+    def add(self, items=0, nbytes=0):
+        """
+        Add processed items and bytes to this measurement.
+        """
+        self.items += items
+        self.nbytes += nbytes
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _record(self.name, time.perf_counter() - self.start, self.items, self.nbytes)
+        return False
+
+
+class _NoTimer(object):
+
+    def add(self, items=0, nbytes=0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+def _record(name, elapsed, items=0, nbytes=0):
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            stat = _stats[name] = Stat(name)
+        stat.record(elapsed, items, nbytes)
+
+
+def enable():
+    """
+    Start recording timings and counts.
+    :return: None
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """
+    Stop recording timings and counts. Recorded statistics are kept until `reset`.
+    :return: None
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """
+    Forget all recorded statistics.
+    :return: None
+    """
+    with _lock:
+        _stats.clear()
+
+
+def timer(name):
+    """
+    Context manager that records the latency of the with-block under the given name. Processed items and bytes
+    can be added to the measurement:
+    ```
+    with timing.timer('fs.sha1_for_file') as t:
+        ...
+        t.add(nbytes=size)
+    ```
+    When timing is disabled a shared no-op timer is returned.
+
+    :param name: name of the measurement
+    :return: the timer
+    """
+    return _Timer(name) if _enabled else _NO_TIMER
+
+
+def timed(name=None):
+    """
+    Decorator that records the latency of each call of the decorated function. When timing is disabled, the
+    function is called directly. Can be used as `@timed`, `@timed()` or `@timed('name')`.
+
+    :param name: name of the measurement, default module and name of the function
+    :return: the decorator
+    """
+    if callable(name):
+        return timed()(name)
+    if name is not None and not isinstance(name, str):
+        raise TypeError('name must be a str, not {}'.format(type(name).__name__))
+
+    def decorator(func):
+        stat_name = name or '{}.{}'.format(func.__module__, func.__qualname__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(stat_name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count(name, items=1, nbytes=0):
+    """
+    Count items and bytes under the given name, without recording a latency.
+
+    :param name: name of the counter
+    :param items: number of items, default 1
+    :param nbytes: number of bytes, default 0
+    :return: None
+    """
+    if _enabled:
+        _record(name, None, items, nbytes)
+
+
+def summary():
+    """
+    Summarize the recorded statistics. A DataFrame can be made with `pd.DataFrame.from_dict(summary(), orient='index')`.
+
+    :return: dict of name to a dict with count, latencies, items, bytes and throughput
+    """
+    with _lock:
+        return {name: stat.summary() for name, stat in sorted(_stats.items())}
+
+
+def log_summary(level=logging.INFO):
+    """
+    Log one message per recorded name with its summary. Started with `format.start_file_logging`, the summaries
+    end up in the CSV log file.
+
+    :param level: log level of the messages
+    :return: None
+    """
+    for name, stats in summary().items():
+        _log.log(level, '{} {}'.format(name, ' '.join('{}={}'.format(k, _round(v)) for k, v in stats.items())))
+
+
+def _round(value):
+    return round(value, 3) if isinstance(value, float) else value